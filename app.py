@@ -2,16 +2,29 @@
 import os, sys
 import json
 import base64
+import gzip
+import hashlib
+import importlib.util
+import io
+import mimetypes
+import secrets
 import asyncio
 import threading
-import webbrowser
+import time
+from functools import lru_cache, wraps
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from typing import List, Dict, Tuple, Optional
-import httpx
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-import uvicorn
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import NotModifiedResponse
+
+# WHY: cold start matters for the packaged app. httpx, uvicorn, cProfile and
+# webbrowser are imported where they are first used, not at module import,
+# and nothing touches the filesystem until the server starts (ensure_files()).
 
 APP_NAME = "CryptoWatcher"
 
@@ -21,15 +34,12 @@ def _base_dir():
 def _user_data_dir():
     # default if CW_DATA_DIR is not set (dev/local)
     home = os.path.expanduser("~")
-    d = os.path.join(home, "Library", "Application Support", APP_NAME) if sys.platform=="darwin" \
+    return os.path.join(home, "Library", "Application Support", APP_NAME) if sys.platform=="darwin" \
         else os.path.join(home, f".{APP_NAME.lower()}")
-    os.makedirs(d, exist_ok=True)
-    return d
 
 BASE_DIR = _base_dir()
 STATIC_DIR = os.path.join(BASE_DIR, "static")
-DATA_ROOT = os.getenv("CW_DATA_DIR", _user_data_dir())   # <- override on Railway
-os.makedirs(DATA_ROOT, exist_ok=True)
+DATA_ROOT = os.getenv("CW_DATA_DIR") or _user_data_dir()   # <- override on Railway
 DATA_FILE = os.path.join(DATA_ROOT, "wallets.json")
 FAVICON_FILE = os.path.join(STATIC_DIR, "favicon1.png")
 
@@ -55,8 +65,13 @@ FAVICON_BASE64 = (
 
 wallets_lock = asyncio.Lock()
 
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+OPEN_BROWSER = os.getenv("CW_NO_BROWSER", "0") != "1"
+
 def ensure_files() -> None:
     os.makedirs(STATIC_DIR, exist_ok=True)
+    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
     if not os.path.exists(DATA_FILE):
         with open(DATA_FILE, "w", encoding="utf-8") as f:
             json.dump([], f)
@@ -67,11 +82,6 @@ def ensure_files() -> None:
         except Exception:
             pass
 
-ensure_files()
-
-app = FastAPI(title="Crypto Watcher")
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-
 # ---------- Models ----------
 
 class WalletCreate(BaseModel):
@@ -109,49 +119,414 @@ def normalize_chain(chain: str) -> str:
         return c
     return aliases.get(c, c)
 
+# --- Base58Check (BTC legacy/P2SH, TRON) ---
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {ch: i for i, ch in enumerate(_B58_ALPHABET)}
+
+def _b58check_decode(s: str) -> Optional[bytes]:
+    """Return the payload (without checksum) or None if the checksum fails."""
+    n = 0
+    for ch in s:
+        i = _B58_INDEX.get(ch)
+        if i is None:
+            return None
+        n = n * 58 + i
+    pad = len(s) - len(s.lstrip("1"))
+    raw = b"\x00" * pad + n.to_bytes((n.bit_length() + 7) // 8, "big")
+    if len(raw) < 5:
+        return None
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        return None
+    return payload
+
+# --- Bech32 / Bech32m (BIP173 / BIP350) ---
+
+_BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_BECH32_INDEX = {ch: i for i, ch in enumerate(_BECH32_CHARSET)}
+_BECH32_CONST = 1
+_BECH32M_CONST = 0x2BC830A3
+
+def _bech32_polymod(values: List[int]) -> int:
+    gen = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    chk = 1
+    for v in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ v
+        for i in range(5):
+            if (top >> i) & 1:
+                chk ^= gen[i]
+    return chk
+
+def _is_valid_segwit_address(addr: str, hrp: str = "bc") -> bool:
+    if len(addr) > 90 or (addr.lower() != addr and addr.upper() != addr):
+        return False
+    addr = addr.lower()
+    pos = addr.rfind("1")
+    if addr[:pos] != hrp or pos + 7 > len(addr):
+        return False
+    data = [_BECH32_INDEX.get(ch, -1) for ch in addr[pos + 1:]]
+    if -1 in data:
+        return False
+    const = _bech32_polymod([ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp] + data)
+    version = data[0]
+    if version > 16 or const != (_BECH32_CONST if version == 0 else _BECH32M_CONST):
+        return False
+    # 5-bit groups -> bytes; leftover bits must be zero padding (< 5 bits)
+    acc, bits, program = 0, 0, []
+    for v in data[1:-6]:
+        acc = (acc << 5) | v
+        bits += 5
+        if bits >= 8:
+            bits -= 8
+            program.append((acc >> bits) & 0xFF)
+    if bits >= 5 or (acc << (8 - bits)) & 0xFF:
+        return False
+    if version == 0:
+        return len(program) in (20, 32)
+    return 2 <= len(program) <= 40
+
+# --- Keccak-256 (EIP-55) ---
+
+_KECCAK_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_KECCAK_ROT = [
+    [0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56], [27, 20, 39, 8, 14],
+]
+# (source lane, destination lane, rotation, 64 - rotation, column) for rho+pi
+_KECCAK_PI = [
+    (x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), _KECCAK_ROT[x][y], 64 - _KECCAK_ROT[x][y], x)
+    for x in range(5) for y in range(5)
+]
+_MASK64 = (1 << 64) - 1
+
+def _keccak_f(a: List[int]) -> List[int]:
+    m = _MASK64
+    for rc in _KECCAK_RC:
+        c0 = a[0] ^ a[5] ^ a[10] ^ a[15] ^ a[20]
+        c1 = a[1] ^ a[6] ^ a[11] ^ a[16] ^ a[21]
+        c2 = a[2] ^ a[7] ^ a[12] ^ a[17] ^ a[22]
+        c3 = a[3] ^ a[8] ^ a[13] ^ a[18] ^ a[23]
+        c4 = a[4] ^ a[9] ^ a[14] ^ a[19] ^ a[24]
+        d = (
+            c4 ^ ((c1 << 1 | c1 >> 63) & m),
+            c0 ^ ((c2 << 1 | c2 >> 63) & m),
+            c1 ^ ((c3 << 1 | c3 >> 63) & m),
+            c2 ^ ((c4 << 1 | c4 >> 63) & m),
+            c3 ^ ((c0 << 1 | c0 >> 63) & m),
+        )
+        b = [0] * 25
+        for src, dst, r, rr, col in _KECCAK_PI:
+            v = a[src] ^ d[col]
+            b[dst] = (v << r | v >> rr) & m
+        a = []
+        for y in (0, 5, 10, 15, 20):
+            b0, b1, b2, b3, b4 = b[y:y + 5]
+            a += (b0 ^ (~b1 & b2), b1 ^ (~b2 & b3), b2 ^ (~b3 & b4), b3 ^ (~b4 & b0), b4 ^ (~b0 & b1))
+        a[0] ^= rc
+    return a
+
+@lru_cache(maxsize=None)
+def _native_keccak256():
+    """C Keccak-256 (pycryptodome, else OpenSSL >= 3.2), probed on first use only."""
+    try:
+        from Crypto.Hash import keccak
+        return lambda data: keccak.new(digest_bits=256, data=data).digest()
+    except ImportError:
+        pass
+    try:
+        hashlib.new("keccak-256")
+        return lambda data: hashlib.new("keccak-256", data).digest()
+    except ValueError:
+        return None
+
+def keccak256(data: bytes) -> bytes:
+    native = _native_keccak256()
+    if native is not None:
+        return native(data)
+    return _keccak256_py(data)
+
+def _keccak256_py(data: bytes) -> bytes:
+    rate = 136
+    buf = bytearray(data) + b"\x01"
+    buf += b"\x00" * (-len(buf) % rate)
+    buf[-1] |= 0x80
+    state = [0] * 25
+    for off in range(0, len(buf), rate):
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(buf[off + 8 * i: off + 8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:4])
+
+def _is_eip55_checksummed(addr: str) -> bool:
+    body = addr[2:]
+    digest = keccak256(body.lower().encode("ascii")).hex()
+    for ch, h in zip(body, digest):
+        if ch.isalpha() and (ch.isupper() != (int(h, 16) >= 8)):
+            return False
+    return True
+
+# --- Per-chain validators ---
+
 def is_valid_btc_address(addr: str) -> bool:
-    return isinstance(addr, str) and 26 <= len(addr) <= 62 and (addr.startswith("1") or addr.startswith("3") or addr.startswith("bc1"))
+    if not isinstance(addr, str) or not 26 <= len(addr) <= 90:
+        return False
+    if addr[:3].lower() == "bc1":
+        return _is_valid_segwit_address(addr)
+    if addr[0] not in "13" or len(addr) > 35:
+        return False
+    payload = _b58check_decode(addr)
+    return payload is not None and len(payload) == 21 and payload[0] in (0x00, 0x05)
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
 
 def is_valid_eth_address(addr: str) -> bool:
     if not isinstance(addr, str) or len(addr) != 42 or not addr.startswith("0x"):
         return False
-    try:
-        int(addr[2:], 16)
-        return True
-    except ValueError:
+    body = addr[2:]
+    if not _HEX_DIGITS.issuperset(body):
         return False
+    # WHY: all-lower/all-upper carries no checksum (EIP-55); mixed case must match it.
+    if body.lower() == body or body.upper() == body:
+        return True
+    return _is_eip55_checksummed(addr)
 
 def is_valid_trx_address(addr: str) -> bool:
-    return isinstance(addr, str) and addr.startswith("T") and 26 <= len(addr) <= 36
+    if not isinstance(addr, str) or len(addr) != 34 or not addr.startswith("T"):
+        return False
+    payload = _b58check_decode(addr)
+    return payload is not None and len(payload) == 21 and payload[0] == 0x41
+
+@lru_cache(maxsize=1 << 18)
+def is_valid_address(chain: str, address: str) -> bool:
+    """Memoized per (chain, address): bulk imports and every load re-check the same strings."""
+    c = normalize_chain(chain)
+    if c == "BTC":
+        return is_valid_btc_address(address)
+    if c in {"ETH", "USDT_ETH", "USDC_ETH"}:
+        return is_valid_eth_address(address)
+    if c in {"TRX", "USDT_TRX"}:
+        return is_valid_trx_address(address)
+    return False
 
 def validate_address(chain: str, address: str) -> None:
     c = normalize_chain(chain)
-    ok = (
-        is_valid_btc_address(address) if c == "BTC"
-        else is_valid_eth_address(address) if c in {"ETH", "USDT_ETH", "USDC_ETH"}
-        else is_valid_trx_address(address) if c in {"TRX", "USDT_TRX"}
-        else False
-    )
-    if not ok:
+    if not is_valid_address(c, address):
         raise HTTPException(status_code=400, detail=f"Invalid {c} address format")
 
 # ---------- HTTP client & test hook ----------
 
-_client: Optional[httpx.AsyncClient] = None
+# HTTP/2 in httpx needs the optional h2 package; probe without importing it.
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+HTTP_KEEPALIVE_EXPIRY = 60.0
+HTTP_WARMUP = os.getenv("CW_HTTP_WARMUP", "1") != "0"
+HTTP_WARMUP_TIMEOUT = 5.0
+
+# WHY: one shared default pool made every provider queue behind the others.
+# Each origin gets its own pool sized to how hard check cycles hit it.
+PROVIDER_POOL_SIZES = {
+    "https://blockstream.info": 32,
+    "https://api.blockcypher.com": 4,
+    "https://api.trongrid.io": 32,
+    "https://apilist.tronscanapi.com": 16,
+    "https://api.etherscan.io": 4,
+    "https://api.coingecko.com": 2,
+}
+ETH_RPC_POOL_SIZE = 32
+
+def _provider_pools() -> Dict[str, int]:
+    pools = dict(PROVIDER_POOL_SIZES)
+    for rpc in ETH_RPCS:
+        scheme, _, rest = rpc.partition("://")
+        pools.setdefault(f"{scheme}://{rest.split('/', 1)[0]}", ETH_RPC_POOL_SIZE)
+    return pools
+
+def _proxy_for(origin: str) -> Optional[str]:
+    """HTTP(S)_PROXY / ALL_PROXY for `origin` unless NO_PROXY exempts its host."""
+    import urllib.request
+    proxies = urllib.request.getproxies()
+    scheme, _, host = origin.partition("://")
+    proxy = proxies.get(scheme) or proxies.get("all")
+    if proxy and host and urllib.request.proxy_bypass(host):
+        return None
+    return proxy
+
+def _transport(pool_size: int, proxy: Optional[str] = None) -> "httpx.AsyncHTTPTransport":
+    import httpx
+    # An explicit transport makes httpx ignore proxy env vars, so pass them on.
+    return httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        proxy=proxy,
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+_client: Optional["httpx.AsyncClient"] = None
 
-def get_client() -> httpx.AsyncClient:
+def get_client() -> "httpx.AsyncClient":
     global _client
     if _client is None:
+        import httpx
         _client = httpx.AsyncClient(
             timeout=HTTP_TIMEOUT,
             headers={"User-Agent": "CryptoWatcher/1.2"},
+            transport=_transport(16, _proxy_for("https://")),
+            mounts={origin: _transport(size, _proxy_for(origin)) for origin, size in _provider_pools().items()},
         )
     return _client
 
-def set_http_client_for_tests(client: httpx.AsyncClient) -> None:
+def set_http_client_for_tests(client: "httpx.AsyncClient") -> None:
     global _client
     _client = client
 
+async def close_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+async def warmup_client(resolve: bool = True) -> None:
+    """Resolve DNS and open one keep-alive connection per provider origin."""
+    if _client is None:
+        # Import httpx off the event loop so early requests aren't stalled.
+        await asyncio.to_thread(importlib.import_module, "httpx")
+    client = get_client()
+    loop = asyncio.get_running_loop()
+
+    async def warm(origin: str) -> None:
+        try:
+            if resolve:
+                await loop.getaddrinfo(origin.split("://", 1)[1], 443)
+            await client.head(origin, timeout=HTTP_WARMUP_TIMEOUT)
+        except Exception:
+            pass
+
+    await asyncio.gather(*(warm(origin) for origin in _provider_pools()))
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    ensure_files()
+    await preload_wallets()
+    # Warm in the background so startup never waits on a slow provider.
+    warm_task = asyncio.create_task(warmup_client()) if HTTP_WARMUP else None
+    try:
+        yield
+    finally:
+        if warm_task is not None:
+            warm_task.cancel()
+        await flush_wallets()
+        await close_client()
+
+# ---------- Timing & profiling ----------
+
+SERVER_TIMING = os.getenv("CW_SERVER_TIMING", "0") == "1"
+DEBUG_TOKEN = os.getenv("CW_DEBUG_TOKEN", "")
+
+# Per-request {metric: milliseconds}; None when the request didn't ask for timings.
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("cw_timings", default=None)
+
+@contextmanager
+def timing(name: str):
+    """Add wall time of the block to the current request's Server-Timing metric `name`."""
+    t = _timings.get()
+    if t is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        t[name] = t.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+def timed_handler(fn):
+    """Record the endpoint body as `handler`; the rest of `total` is encoding/framework."""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with timing("handler"):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    parts = []
+    for name, ms in timings.items():
+        desc = ';desc="cumulative"' if name.startswith("fetch_") else ""
+        parts.append(f"{name};dur={ms:.1f}{desc}")
+    return ", ".join(parts)
+
+class ProfileCapture:
+    """
+    cProfile for the next N requests under a path prefix, merged into one pstats.
+
+    cProfile is per-thread, so a capture also sees other tasks interleaving on
+    the event loop while the profiled request awaits. Only one request is
+    profiled at a time.
+    """
+
+    def __init__(self) -> None:
+        self.remaining = 0
+        self.path = "/api/check"
+        self.captured = 0
+        self.stats: Optional["pstats.Stats"] = None
+        self._active = False
+
+    def arm(self, requests: int, path: str) -> None:
+        self.remaining, self.path = requests, path
+        self.captured, self.stats = 0, None
+
+    def start(self, path: str) -> Optional["cProfile.Profile"]:
+        if self._active or self.remaining <= 0 or not path.startswith(self.path):
+            return None
+        import cProfile
+        self._active = True
+        self.remaining -= 1
+        prof = cProfile.Profile()
+        prof.enable()
+        return prof
+
+    def finish(self, prof: "cProfile.Profile") -> None:
+        import pstats
+        prof.disable()
+        self._active = False
+        self.captured += 1
+        if self.stats is None:
+            self.stats = pstats.Stats(prof)
+        else:
+            self.stats.add(prof)
+
+    def as_text(self, sort: str, limit: int) -> str:
+        buf = io.StringIO()
+        self.stats.stream = buf
+        try:
+            self.stats.sort_stats(sort).print_stats(limit)
+        finally:
+            self.stats.stream = sys.stdout
+        return buf.getvalue()
+
+    def as_pstats(self) -> bytes:
+        # Same bytes Stats.dump_stats() writes; loadable by pstats/snakeviz/flameprof.
+        import marshal
+        return marshal.dumps(self.stats.stats)
+
+profiler = ProfileCapture()
+
+def require_debug_token(token: Optional[str]) -> None:
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
 # ---------- Prices ----------
 
 async def fetch_usd_prices() -> Dict[str, float]:
@@ -160,7 +535,8 @@ async def fetch_usd_prices() -> Dict[str, float]:
     url = ("https://api.coingecko.com/api/v3/simple/price"
            "?ids=bitcoin,ethereum,tron&vs_currencies=usd")
     try:
-        r = await get_client().get(url)
+        with timing("price"):
+            r = await get_client().get(url)
         if r.status_code == 200:
             data = r.json()
             base["BTC"] = float(data.get("bitcoin", {}).get("usd", 0.0) or 0.0)
@@ -196,19 +572,251 @@ def build_wallet_response(wallet: Dict, prices: Dict[str, float]) -> Dict:
         "raw_balance": raw,
         "coin_balance": coin_balance,
         "usd_balance": usd_balance,
+        "invalid": bool(wallet.get("invalid", False)),
     }
 
 def build_wallets_with_balances(wallets: List[Dict], prices: Dict[str, float]) -> Tuple[List[Dict], float]:
     res, total = [], 0.0
-    for w in wallets:
-        out = build_wallet_response(w, prices)
-        total += float(out["usd_balance"])
-        res.append(out)
+    with timing("build"):
+        for w in wallets:
+            out = build_wallet_response(w, prices)
+            total += float(out["usd_balance"])
+            res.append(out)
     return res, total
 
+# ---------- Portfolio aggregation ----------
+
+UNIT_DIVISORS = {
+    "BTC": BTC_SATOSHIS,
+    "ETH": ETH_WEI,
+    "TRX": TRX_SUN,
+    "USDT_TRX": DECIMALS_6,
+    "USDT_ETH": DECIMALS_6,
+    "USDC_ETH": DECIMALS_6,
+}
+
+class PortfolioAggregator:
+    """
+    Column store of raw balances grouped by chain code.
+
+    WHY: Totals used to be rebuilt by walking every wallet dict. Here each chain
+    keeps parallel id/raw/label columns plus running raw sums per chain and per
+    (chain, label), updated as balances change. A balance change is an O(1)
+    delta, and `summary()` only loops over the chains and labels, not over the
+    wallets.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+        self.loaded = False
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, List[int]] = {c: [] for c in CANONICAL_CHAINS}
+        self._raw: Dict[str, List[int]] = {c: [] for c in CANONICAL_CHAINS}
+        self._labels: Dict[str, List[str]] = {c: [] for c in CANONICAL_CHAINS}
+        self._pos: Dict[int, Tuple[str, int]] = {}
+        self._chain_raw: Dict[str, int] = {c: 0 for c in CANONICAL_CHAINS}
+        self._label_raw: Dict[Tuple[str, str], int] = {}
+        self._label_count: Dict[Tuple[str, str], int] = {}
+
+    def load(self, wallets: List[Dict]) -> None:
+        """Rebuild all columns from a wallet list (full resync)."""
+        self._reset()
+        for w in wallets:
+            c = normalize_chain(w.get("chain", ""))
+            if c not in CANONICAL_CHAINS:
+                continue
+            self._pos[int(w["id"])] = (c, len(self._ids[c]))
+            self._ids[c].append(int(w["id"]))
+            self._raw[c].append(int(w.get("last_raw_balance", 0) or 0))
+            self._labels[c].append(w.get("label", "") or "")
+        for c in CANONICAL_CHAINS:
+            self._chain_raw[c] = sum(self._raw[c])
+            for label, raw in zip(self._labels[c], self._raw[c]):
+                key = (c, label)
+                self._label_raw[key] = self._label_raw.get(key, 0) + raw
+                self._label_count[key] = self._label_count.get(key, 0) + 1
+        self.loaded = True
+
+    def _label_add(self, chain: str, label: str, raw: int, count: int) -> None:
+        key = (chain, label)
+        n = self._label_count.get(key, 0) + count
+        if n <= 0:
+            self._label_raw.pop(key, None)
+            self._label_count.pop(key, None)
+            return
+        self._label_raw[key] = self._label_raw.get(key, 0) + raw
+        self._label_count[key] = n
+
+    def set_balance(self, wallet_id: int, raw: int) -> None:
+        """Apply a single balance change as a delta on the running sums."""
+        pos = self._pos.get(wallet_id)
+        if pos is None:
+            return
+        c, i = pos
+        raw = int(raw)
+        delta = raw - self._raw[c][i]
+        if not delta:
+            return
+        self._raw[c][i] = raw
+        self._chain_raw[c] += delta
+        self._label_add(c, self._labels[c][i], delta, 0)
+
+    def remove(self, wallet_id: int) -> None:
+        pos = self._pos.pop(wallet_id, None)
+        if pos is None:
+            return
+        c, i = pos
+        raw, label = self._raw[c][i], self._labels[c][i]
+        self._chain_raw[c] -= raw
+        self._label_add(c, label, -raw, -1)
+        # swap-remove keeps the columns dense without shifting every index
+        last = len(self._ids[c]) - 1
+        if i != last:
+            moved = self._ids[c][last]
+            self._ids[c][i] = moved
+            self._raw[c][i] = self._raw[c][last]
+            self._labels[c][i] = self._labels[c][last]
+            self._pos[moved] = (c, i)
+        self._ids[c].pop(); self._raw[c].pop(); self._labels[c].pop()
+
+    def upsert(self, wallet: Dict) -> None:
+        """Add a wallet or move it to its current chain/label group."""
+        wid = int(wallet["id"])
+        c = normalize_chain(wallet.get("chain", ""))
+        label = wallet.get("label", "") or ""
+        raw = int(wallet.get("last_raw_balance", 0) or 0)
+        pos = self._pos.get(wid)
+        if pos is not None and pos[0] == c and self._labels[c][pos[1]] == label:
+            self.set_balance(wid, raw)
+            return
+        self.remove(wid)
+        if c not in CANONICAL_CHAINS:
+            return
+        self._pos[wid] = (c, len(self._ids[c]))
+        self._ids[c].append(wid)
+        self._raw[c].append(raw)
+        self._labels[c].append(label)
+        self._chain_raw[c] += raw
+        self._label_add(c, label, raw, 1)
+
+    def summary(self, prices: Dict[str, float]) -> Dict:
+        chains: Dict[str, Dict] = {}
+        total_usd = 0.0
+        for c in sorted(CANONICAL_CHAINS):
+            coin = self._chain_raw[c] / UNIT_DIVISORS[c]
+            usd = coin * float(prices.get(c, 0.0) or 0.0)
+            total_usd += usd
+            chains[c] = {
+                "count": len(self._ids[c]),
+                "raw_balance": self._chain_raw[c],
+                "coin_balance": coin,
+                "usd_balance": usd,
+            }
+        labels: Dict[str, Dict] = {}
+        for (c, label), raw in sorted(self._label_raw.items()):
+            coin = raw / UNIT_DIVISORS[c]
+            usd = coin * float(prices.get(c, 0.0) or 0.0)
+            entry = labels.setdefault(label, {"count": 0, "usd_balance": 0.0, "chains": {}})
+            entry["count"] += self._label_count[(c, label)]
+            entry["usd_balance"] += usd
+            entry["chains"][c] = {"coin_balance": coin, "usd_balance": usd}
+        return {
+            "wallet_count": len(self._pos),
+            "total_usd": total_usd,
+            "usd_prices": prices,
+            "chains": chains,
+            "labels": labels,
+        }
+
+portfolio = PortfolioAggregator()
+
+async def ensure_portfolio() -> PortfolioAggregator:
+    if not portfolio.loaded:
+        portfolio.load(await load_wallets())
+    return portfolio
+
+# ---------- Change sequence (delta sync) ----------
+
+class ChangeLog:
+    """
+    Monotonic change sequence over wallet mutations and balance changes.
+
+    WHY: clients used to re-download and re-render every wallet on each poll.
+    They now send back the last `seq` they saw and get only what changed.
+    Sequences start at the process start time in ms, so they keep increasing
+    across restarts; any `since` older than `base` (or from the future) gets a
+    full resync instead of a delta.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget history; every client falls back to a full resync."""
+        self.base = max(time.time_ns() // 1_000_000, getattr(self, "seq", 0) + 1)
+        self.seq = self.base
+        self._changed: Dict[int, int] = {}
+        self._created: Dict[int, int] = {}
+        self._deleted: Dict[int, int] = {}
+
+    def touch(self, wallet_id: int, created: bool = False) -> None:
+        self.seq += 1
+        self._changed[wallet_id] = self.seq
+        self._deleted.pop(wallet_id, None)
+        if created:
+            self._created[wallet_id] = self.seq
+
+    def delete(self, wallet_id: int) -> None:
+        self.seq += 1
+        self._deleted[wallet_id] = self.seq
+        self._changed.pop(wallet_id, None)
+        self._created.pop(wallet_id, None)
+
+    def since(self, seq: int) -> Optional[Tuple[set, set, List[int]]]:
+        """(added ids, updated ids, deleted ids) after `seq`, or None if a full resync is needed."""
+        if seq < self.base or seq > self.seq:
+            return None
+        added = {wid for wid, s in self._created.items() if s > seq}
+        updated = {wid for wid, s in self._changed.items() if s > seq} - added
+        deleted = sorted(wid for wid, s in self._deleted.items() if s > seq)
+        return added, updated, deleted
+
+changes = ChangeLog()
+
+def build_delta(wallets: List[Dict], since: int, prices: Dict[str, float],
+                seq: int, delta: Optional[Tuple[set, set, List[int]]]) -> Dict:
+    """
+    Delta (or full resync) payload for a client that last saw `since`.
+
+    `seq` and `delta` must be captured under `wallets_lock` together with
+    `wallets`; reading them later would skip changes made in between.
+    """
+    out = {
+        "since": since,
+        "seq": seq,
+        "usd_prices": prices,
+        "summary": portfolio.summary(prices),
+    }
+    out["total_usd"] = out["summary"]["total_usd"]
+    if delta is None:
+        out.update({"full": True, "wallets": build_wallets_with_balances(wallets, prices)[0],
+                    "added": [], "updated": [], "deleted": []})
+        return out
+    added, updated, deleted = delta
+    with timing("build"):
+        out.update({
+            "full": False,
+            "added": [build_wallet_response(w, prices) for w in wallets if w["id"] in added],
+            "updated": [build_wallet_response(w, prices) for w in wallets if w["id"] in updated],
+            "deleted": deleted,
+        })
+    return out
+
 # ---------- Fetch helpers ----------
 
-async def _retry(call, *args, previous: int) -> Tuple[int, bool]:
+async def _retry(call, *args, previous: int, strict: bool = False) -> Tuple[int, bool]:
+    """Up to three attempts; on failure return `previous`, or re-raise when `strict`."""
     rate_limited = False
     for attempt in range(3):
         try:
@@ -216,6 +824,8 @@ async def _retry(call, *args, previous: int) -> Tuple[int, bool]:
             rate_limited = rate_limited or rl
             return raw, rate_limited
         except Exception:
+            if strict and attempt == 2:
+                raise
             await asyncio.sleep(0.25 * (attempt + 1))
     return previous, rate_limited
 
@@ -292,6 +902,67 @@ async def fetch_eth_raw_balance(address: str, previous: int) -> Tuple[int, bool]
             raise last_exc
         raise
 
+# --- TRON activity cursors ---
+
+TRON_INCREMENTAL = os.getenv("CW_TRON_INCREMENTAL", "1") != "0"
+TRON_FULL_REFRESH_SECONDS = 3600
+TRON_CURSOR_SKEW_MS = 60_000
+
+# (address, "TRX" | TRC20 contract) -> {"ts": min_timestamp for the next query,
+# "raw": balance at the last full refresh, "refreshed": time.time() of that refresh}
+_tron_cursors: Dict[Tuple[str, str], Dict] = {}
+
+async def _tron_activity_since(address: str, asset: str, min_ts: int) -> Tuple[int, bool]:
+    """
+    Return (newest block_timestamp at or after min_ts, rate_limited).
+    0 means no activity. Asks for a single row so quiet addresses cost one tiny request.
+    """
+    params = {"min_timestamp": str(min_ts), "limit": "1", "order_by": "block_timestamp,desc"}
+    if asset == "TRX":
+        url = f"https://api.trongrid.io/v1/accounts/{address}/transactions"
+    else:
+        url = f"https://api.trongrid.io/v1/accounts/{address}/transactions/trc20"
+        params["contract_address"] = asset
+    r = await get_client().get(url, params=params)
+    if r.status_code == 429: return 0, True
+    r.raise_for_status()
+    rows = (r.json() or {}).get("data") or []
+    if not rows: return 0, False
+    return int((rows[0] or {}).get("block_timestamp", 0) or 0), False
+
+async def _tron_incremental(address: str, asset: str, previous: int, full) -> Tuple[int, bool]:
+    """
+    WHY: polling re-downloaded the whole account document every cycle just to
+    compare one number. With a cursor we only ask whether anything happened
+    since the last refresh and call `full()` (the regular balance fetch) when it did.
+    Missing/stale cursors, a balance that no longer matches `previous`, lookup
+    errors and the periodic safety refresh all fall back to `full()`.
+    `full()` raises when every provider failed; the cursor is then left where
+    it was so the activity that triggered the refresh is seen again next poll.
+    """
+    key = (address, asset)
+    cur = _tron_cursors.get(key)
+    now = time.time()
+    newest = 0
+    if cur and cur["raw"] == previous and now - cur["refreshed"] < TRON_FULL_REFRESH_SECONDS:
+        try:
+            newest, rl = await _tron_activity_since(address, asset, cur["ts"])
+            if rl:
+                return previous, True
+            if not newest:
+                return previous, False
+        except Exception:
+            pass
+    started_ms = int(now * 1000) - TRON_CURSOR_SKEW_MS
+    try:
+        raw, rl = await full()
+    except Exception:
+        return previous, False
+    if not rl:
+        ts = max(started_ms, newest + 1, cur["ts"] if cur else 0)
+        _tron_cursors[key] = {"ts": ts, "raw": int(raw), "refreshed": now}
+    return raw, rl
+
 # --- TRX native ---
 
 async def _trx_trongrid(address: str, *, previous: int) -> Tuple[int, bool]:
@@ -317,11 +988,16 @@ async def _trx_tronscan(address: str, *, previous: int) -> Tuple[int, bool]:
                 pass
     return 0, False
 
-async def fetch_trx_raw_balance(address: str, previous: int) -> Tuple[int, bool]:
+async def _fetch_trx_full(address: str, previous: int, strict: bool = False) -> Tuple[int, bool]:
     try:
-        return await _retry(_trx_trongrid, address, previous=previous)
+        return await _retry(_trx_trongrid, address, previous=previous, strict=strict)
     except Exception:
-        return await _retry(_trx_tronscan, address, previous=previous)
+        return await _retry(_trx_tronscan, address, previous=previous, strict=strict)
+
+async def fetch_trx_raw_balance(address: str, previous: int) -> Tuple[int, bool]:
+    if not TRON_INCREMENTAL:
+        return await _fetch_trx_full(address, previous)
+    return await _tron_incremental(address, "TRX", previous, lambda: _fetch_trx_full(address, previous, strict=True))
 
 # --- ERC20 balances (USDT/USDC) ---
 
@@ -389,11 +1065,18 @@ async def _trc20_from_tronscan(address: str, contract: str, *, previous: int) ->
                 pass
     return 0, False
 
-async def fetch_trc20_raw_balance(address: str, token_contract: str, previous: int) -> Tuple[int, bool]:
+async def _fetch_trc20_full(address: str, token_contract: str, previous: int, strict: bool = False) -> Tuple[int, bool]:
     try:
-        return await _retry(_trc20_from_trongrid, address, token_contract, previous=previous)
+        return await _retry(_trc20_from_trongrid, address, token_contract, previous=previous, strict=strict)
     except Exception:
-        return await _retry(_trc20_from_tronscan, address, token_contract, previous=previous)
+        return await _retry(_trc20_from_tronscan, address, token_contract, previous=previous, strict=strict)
+
+async def fetch_trc20_raw_balance(address: str, token_contract: str, previous: int) -> Tuple[int, bool]:
+    if not TRON_INCREMENTAL:
+        return await _fetch_trc20_full(address, token_contract, previous)
+    return await _tron_incremental(
+        address, token_contract, previous, lambda: _fetch_trc20_full(address, token_contract, previous, strict=True)
+    )
 
 # ---------- Chain selector ----------
 
@@ -415,59 +1098,265 @@ async def fetch_chain_raw_balance(chain: str, address: str, previous: int) -> Tu
 
 # ---------- Storage ----------
 
-async def load_wallets() -> List[Dict]:
+# WHY: every route used to re-read the file, edit its own copy and rewrite
+# the whole file, so a label edit racing a check cycle lost one side's
+# changes. The in-memory registry is now authoritative: mutate it only while
+# holding `wallets_lock`, then call `mark_wallets_dirty()`; a write-behind
+# task coalesces bursts into one atomic file write.
+WALLETS_FLUSH_DELAY = 0.5
+
+_registry: Optional[List[Dict]] = None
+_dirty = False
+_flush_task: Optional[asyncio.Task] = None
+_flush_lock = asyncio.Lock()
+
+def _read_wallets_file() -> List[Dict]:
+    try:
+        with open(DATA_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return []
+    out = []
+    for w in data if isinstance(data, list) else []:
+        if not isinstance(w, dict): continue
+        wid = int(w.get("id", 0) or 0)
+        chain = normalize_chain(w.get("chain", ""))
+        addr = str(w.get("address", "")).strip()
+        if not wid or chain not in CANONICAL_CHAINS or not addr:
+            continue
+        out.append({
+            "id": wid,
+            "chain": chain,
+            "address": addr,
+            "label": w.get("label", "") or "",
+            "notes": w.get("notes", "") or "",
+            "last_raw_balance": int(w.get("last_raw_balance", 0) or 0),
+            # WHY: wallets stored before checksum validation may be typos; keep
+            # them visible but never poll them.
+            "invalid": not is_valid_address(chain, addr),
+        })
+    return out
+
+def _registry_unlocked() -> List[Dict]:
+    """The live wallet list. Caller must hold `wallets_lock`."""
+    global _registry
+    if _registry is None:
+        _registry = _read_wallets_file()
+    return _registry
+
+async def preload_wallets() -> None:
+    """Read and validate the stored registry in a worker thread, not on the event loop."""
+    global _registry
     async with wallets_lock:
+        if _registry is None:
+            _registry = await asyncio.to_thread(_read_wallets_file)
+
+def _write_file_atomic(path: str, text: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def mark_wallets_dirty() -> None:
+    """Schedule a coalesced write of the registry. Caller must hold `wallets_lock`."""
+    global _dirty, _flush_task
+    _dirty = True
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.get_running_loop().create_task(_flush_later())
+
+async def _flush_later() -> None:
+    # Edits made while a write is in flight see this task still running and
+    # don't schedule another, so keep going until nothing is left dirty.
+    while _dirty:
+        await asyncio.sleep(WALLETS_FLUSH_DELAY)
+        await flush_wallets()
+
+async def flush_wallets() -> None:
+    """Write the registry to disk if anything changed since the last write."""
+    global _dirty
+    async with _flush_lock:
+        async with wallets_lock:
+            if not _dirty:
+                return
+            # "invalid" is recomputed on every load, so it never goes to disk
+            stored = [{k: v for k, v in w.items() if k != "invalid"} for w in _registry_unlocked()]
+            text = json.dumps(stored, ensure_ascii=False, indent=2)
+            _dirty = False
         try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
-        out = []
-        for w in data if isinstance(data, list) else []:
-            if not isinstance(w, dict): continue
-            wid = int(w.get("id", 0) or 0)
-            chain = normalize_chain(w.get("chain", ""))
-            addr = str(w.get("address", "")).strip()
-            if not wid or chain not in CANONICAL_CHAINS or not addr:
-                continue
-            out.append({
-                "id": wid,
-                "chain": chain,
-                "address": addr,
-                "label": w.get("label", "") or "",
-                "notes": w.get("notes", "") or "",
-                "last_raw_balance": int(w.get("last_raw_balance", 0) or 0),
-            })
-        return out
+            await asyncio.to_thread(_write_file_atomic, DATA_FILE, text)
+        except Exception:
+            async with wallets_lock:
+                _dirty = True
+            raise
+
+async def load_wallets() -> List[Dict]:
+    """Snapshot copy of the registry; safe to read without the lock."""
+    with timing("storage"):
+        async with wallets_lock:
+            return [dict(w) for w in _registry_unlocked()]
+
+async def load_wallets_since(since: Optional[int]) -> Tuple[List[Dict], int, Optional[Tuple[set, set, List[int]]]]:
+    """Snapshot plus the change `seq` and the delta after `since`, all taken under one lock."""
+    with timing("storage"):
+        async with wallets_lock:
+            wallets = [dict(w) for w in _registry_unlocked()]
+            return wallets, changes.seq, (changes.since(since) if since is not None else None)
 
 async def save_wallets(wallets: List[Dict]) -> None:
+    """Replace the whole registry (write-behind)."""
+    global _registry
     async with wallets_lock:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(wallets, f, ensure_ascii=False, indent=2)
+        _registry = [dict(w) for w in wallets]
+        mark_wallets_dirty()
+
+def parse_bulk_lines(chain: str, lines: str) -> List[Tuple[str, str]]:
+    """Split `address[,label]` lines, dropping blanks and invalid addresses."""
+    out = []
+    for line in lines.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "," in line:
+            addr, label = line.split(",", 1)
+            addr, label = addr.strip(), label.strip()
+        else:
+            addr, label = line, ""
+        if is_valid_address(chain, addr):
+            out.append((addr, label))
+    return out
 
 def next_wallet_id(wallets: List[Dict]) -> int:
     return (max((w.get("id", 0) for w in wallets), default=0) or 0) + 1
 
+# ---------- Static assets ----------
+
+STATIC_IMMUTABLE = "public, max-age=31536000, immutable"
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a fresh `<file>.gz` sibling (scripts/precompress_static.py)
+    to gzip-capable clients, and marks versioned URLs (`?v=`) immutable.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        versioned = b"v=" in scope.get("query_string", b"")
+        headers = {"Cache-Control": STATIC_IMMUTABLE if versioned else "no-cache", "Vary": "Accept-Encoding"}
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+        if "gzip" in request_headers.get("accept-encoding", ""):
+            try:
+                gz_stat = os.stat(f"{full_path}.gz")
+            except OSError:
+                gz_stat = None
+            if gz_stat is not None and gz_stat.st_mtime >= stat_result.st_mtime:
+                full_path, stat_result = f"{full_path}.gz", gz_stat
+                headers["Content-Encoding"] = "gzip"
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                media_type=media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+def _asset_version(name: str) -> str:
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]
+
+@lru_cache(maxsize=4)
+def _render_index(mtimes: Tuple[float, ...]) -> Tuple[bytes, bytes]:
+    """index.html with content-hashed asset URLs, plain and gzipped (keyed on file mtimes)."""
+    with open(os.path.join(STATIC_DIR, "index.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    for name in ("style.css", "script.js"):
+        html = html.replace(f'"/static/{name}"', f'"/static/{name}?v={_asset_version(name)}"')
+    raw = html.encode("utf-8")
+    return raw, gzip.compress(raw, mtime=0)
+
 # ---------- Routes ----------
 
+app = FastAPI(title="Crypto Watcher", lifespan=lifespan)
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR, check_dir=False), name="static")
+
+class TimingMiddleware:
+    """
+    Server-Timing breakdown (CW_SERVER_TIMING=1 or `X-Server-Timing: 1`) and armed profiles.
+
+    Plain ASGI rather than @app.middleware("http"): requests that want neither
+    (nearly all of them, /static included) go straight through with no extra
+    task or response wrapping.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        want_timing = SERVER_TIMING or (b"x-server-timing", b"1") in scope["headers"]
+        prof = profiler.start(scope["path"])
+        if not want_timing and prof is None:
+            return await self.app(scope, receive, send)
+
+        timings: Optional[Dict[str, float]] = {} if want_timing else None
+        start = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if timings is not None and message["type"] == "http.response.start":
+                total = (time.perf_counter() - start) * 1000
+                if "handler" in timings:
+                    timings["serialize"] = max(total - timings["handler"], 0.0)
+                timings["total"] = total
+                MutableHeaders(scope=message).append("Server-Timing", format_server_timing(timings))
+            await send(message)
+
+        ctx_token = _timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if prof is not None:
+                profiler.finish(prof)
+            _timings.reset(ctx_token)
+
+app.add_middleware(TimingMiddleware)
+
 @app.get("/")
-async def index():
-    index_path = os.path.join(STATIC_DIR, "index.html")
-    if not os.path.exists(index_path):
+async def index(request: Request):
+    try:
+        mtimes = tuple(os.stat(os.path.join(STATIC_DIR, n)).st_mtime for n in ("index.html", "style.css", "script.js"))
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="index.html not found in /static")
-    return FileResponse(index_path)
+    raw, gz = _render_index(mtimes)
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(gz, media_type="text/html", headers=headers)
+    return Response(raw, media_type="text/html", headers=headers)
 
 @app.get("/favicon.ico")
 async def favicon():
     return RedirectResponse(url="/static/favicon1.png")
 
 @app.get("/api/wallets")
-async def get_wallets():
-    wallets = await load_wallets()
+@timed_handler
+async def get_wallets(since: Optional[int] = None):
+    """Full wallet list, or a delta payload when `since` (a previous `seq`) is given."""
+    wallets, seq, delta = await load_wallets_since(since)
+    await ensure_portfolio()
     prices = await fetch_usd_prices()
+    if since is not None:
+        return build_delta(wallets, since, prices, seq, delta)
     wallets_with_balances, _total = build_wallets_with_balances(wallets, prices)
     return wallets_with_balances
 
+@app.get("/api/summary")
+@timed_handler
+async def get_summary():
+    """Per-chain, per-label and overall totals without the wallet list."""
+    agg = await ensure_portfolio()
+    prices = await fetch_usd_prices()
+    return agg.summary(prices)
+
 @app.post("/api/wallets")
 async def create_wallet(payload: WalletCreate):
     chain = normalize_chain(payload.chain)
@@ -478,200 +1367,188 @@ async def create_wallet(payload: WalletCreate):
         raise HTTPException(status_code=400, detail="Address is required")
     validate_address(chain, address)
 
-    wallets = await load_wallets()
-    wid = next_wallet_id(wallets)
-    wallet = {
-        "id": wid,
-        "chain": chain,  # store canonical code
-        "address": address,
-        "label": (payload.label or "").strip(),
-        "notes": (payload.notes or "").strip(),
-        "last_raw_balance": 0,
-    }
-    wallets.append(wallet)
-    await save_wallets(wallets)
-    return wallet
+    async with wallets_lock:
+        wallets = _registry_unlocked()
+        wid = next_wallet_id(wallets)
+        wallet = {
+            "id": wid,
+            "chain": chain,  # store canonical code
+            "address": address,
+            "label": (payload.label or "").strip(),
+            "notes": (payload.notes or "").strip(),
+            "last_raw_balance": 0,
+        }
+        wallets.append(wallet)
+        mark_wallets_dirty()
+        portfolio.upsert(wallet)
+        changes.touch(wid, created=True)
+        return dict(wallet)
 
 @app.post("/api/wallets/bulk")
 async def bulk_create_wallets(payload: BulkImportRequest):
     chain = normalize_chain(payload.chain)
     if chain not in CANONICAL_CHAINS:
         raise HTTPException(status_code=400, detail=f"Unsupported chain: {payload.chain}")
-    wallets = await load_wallets()
-    created = []
-    for line in (payload.lines or "").splitlines():
-        line = (line or "").strip()
-        if not line:
-            continue
-        if "," in line:
-            addr, label = line.split(",", 1)
-            addr, label = addr.strip(), label.strip()
-        else:
-            addr, label = line, ""
-        try:
-            validate_address(chain, addr)
-        except HTTPException:
-            continue
+    # Checksum validation is CPU-bound on large pastes; keep the event loop free.
+    parsed = await asyncio.to_thread(parse_bulk_lines, chain, payload.lines or "")
+    async with wallets_lock:
+        wallets = _registry_unlocked()
+        created = []
         wid = next_wallet_id(wallets)
-        wallet = {"id": wid, "chain": chain, "address": addr, "label": label, "notes": "", "last_raw_balance": 0}
-        wallets.append(wallet); created.append(wallet)
-    await save_wallets(wallets)
+        for addr, label in parsed:
+            wallet = {"id": wid, "chain": chain, "address": addr, "label": label, "notes": "", "last_raw_balance": 0}
+            wallets.append(wallet); created.append(dict(wallet))
+            portfolio.upsert(wallet)
+            changes.touch(wid, created=True)
+            wid += 1
+        if created:
+            mark_wallets_dirty()
     return created
 
 @app.put("/api/wallets/{wallet_id}")
 async def update_wallet(wallet_id: int, payload: WalletUpdate):
-    wallets = await load_wallets()
-    updated = None
-    for w in wallets:
-        if w.get("id") == wallet_id:
-            if payload.label is not None: w["label"] = (payload.label or "").strip()
-            if payload.notes is not None: w["notes"] = (payload.notes or "").strip()
-            updated = w
-            break
-    if not updated:
-        raise HTTPException(status_code=404, detail="Wallet not found")
-    await save_wallets(wallets)
-    return updated
+    async with wallets_lock:
+        updated = None
+        for w in _registry_unlocked():
+            if w.get("id") == wallet_id:
+                if payload.label is not None: w["label"] = (payload.label or "").strip()
+                if payload.notes is not None: w["notes"] = (payload.notes or "").strip()
+                updated = w
+                break
+        if not updated:
+            raise HTTPException(status_code=404, detail="Wallet not found")
+        mark_wallets_dirty()
+        portfolio.upsert(updated)
+        changes.touch(wallet_id)
+        return dict(updated)
 
 @app.delete("/api/wallets/{wallet_id}")
 async def delete_wallet(wallet_id: int):
-    wallets = await load_wallets()
-    new_wallets = [w for w in wallets if w.get("id") != wallet_id]
-    if len(new_wallets) == len(wallets):
-        raise HTTPException(status_code=404, detail="Wallet not found")
-    await save_wallets(new_wallets)
+    async with wallets_lock:
+        wallets = _registry_unlocked()
+        idx = next((i for i, w in enumerate(wallets) if w.get("id") == wallet_id), None)
+        if idx is None:
+            raise HTTPException(status_code=404, detail="Wallet not found")
+        del wallets[idx]
+        mark_wallets_dirty()
+        portfolio.remove(wallet_id)
+        changes.delete(wallet_id)
     return {"status": "ok"}
 
 @app.delete("/api/wallets")
 async def delete_all_wallets():
     await save_wallets([])
+    portfolio.load([])
+    changes.reset()
     return {"status": "ok"}
 
 @app.post("/api/check")
-async def check_wallets():
+@timed_handler
+async def check_wallets(since: Optional[int] = None):
     wallets = await load_wallets()
+    if not portfolio.loaded:
+        portfolio.load(wallets)
+    by_key = {(w["chain"], w["address"]): w for w in wallets}
 
     # Track which chains hit rate limits
     chain_rate_limited: Dict[str, bool] = {c: False for c in CANONICAL_CHAINS}
 
-    async def update_wallet_balance(w: Dict) -> List[int]:
+    async def update_wallet_balance(w: Dict) -> List[Tuple[Dict, int]]:
         """
-        Updates the main wallet balance, AND (for ETH/TRX wallets) also
-        checks their associated USDT/USDC balances on the same address.
+        Fetches the main wallet balance, AND (for ETH/TRX wallets) also
+        the associated USDT/USDC balances on the same address.
 
-        Returns a list of wallet IDs where the raw balance increased.
+        Returns (wallet, new_raw) pairs to apply to the registry. Token
+        wallets that don't exist yet come back as templates without an id.
+        Nothing is mutated here so no lock is held across network calls.
         """
-        deposit_ids: List[int] = []
+        results: List[Tuple[Dict, int]] = []
 
-        # 1) Update the main chain for this wallet
+        # 1) Main chain for this wallet
         old_raw = int(w.get("last_raw_balance", 0) or 0)
-        new_raw, rl = await fetch_chain_raw_balance(w["chain"], w["address"], old_raw)
-
+        with timing(f"fetch_{w['chain']}"):
+            new_raw, rl = await fetch_chain_raw_balance(w["chain"], w["address"], old_raw)
         if rl:
             chain_rate_limited[w["chain"]] = True
+        results.append((w, int(new_raw)))
 
-        w["last_raw_balance"] = int(new_raw)
-        if new_raw > old_raw:
-            deposit_ids.append(w["id"])
-
-        # 2) Extra ERC20 balances for ETH wallets (USDT & USDC on the same address)
+        # 2) Tokens on the same address: USDT/USDC for ETH, TRC20 USDT for TRX
         if w["chain"] == "ETH":
-            for token_chain, token_contract in [
-                ("USDT_ETH", ERC20_USDT),
-                ("USDC_ETH", ERC20_USDC),
-            ]:
-                # find existing wallet for this token/address
-                token_wallet = next(
-                    (
-                        x
-                        for x in wallets
-                        if x["chain"] == token_chain and x["address"] == w["address"]
-                    ),
-                    None,
-                )
-
-                prev_token_raw = int(
-                    token_wallet.get("last_raw_balance", 0) or 0
-                ) if token_wallet else 0
-
-                token_raw, rl_token = await fetch_erc20_raw_balance(
-                    w["address"], token_contract, prev_token_raw
-                )
-
-                if rl_token:
-                    chain_rate_limited[token_chain] = True
-
-                # Always ensure the token wallet exists, even if balance is 0
-                if token_wallet is None:
-                    token_wallet = {
-                        "id": next_wallet_id(wallets),
-                        "chain": token_chain,
-                        "address": w["address"],
-                        "label": w.get("label", "") or "",
-                        "notes": w.get("notes", "") or "",
-                        "last_raw_balance": int(token_raw),
-                    }
-                    wallets.append(token_wallet)
-                else:
-                    token_wallet["last_raw_balance"] = int(token_raw)
-
-                if token_raw > prev_token_raw:
-                    deposit_ids.append(token_wallet["id"])
-
-        # 3) TRC20 USDT for TRX wallets (same address)
-        if w["chain"] == "TRX":
-            token_chain = "USDT_TRX"
-
-            token_wallet = next(
-                (
-                    x
-                    for x in wallets
-                    if x["chain"] == token_chain and x["address"] == w["address"]
-                ),
-                None,
-            )
-
-            prev_token_raw = int(
-                token_wallet.get("last_raw_balance", 0) or 0
-            ) if token_wallet else 0
-
-            token_raw, rl_token = await fetch_trc20_raw_balance(
-                w["address"], TRC20_USDT, prev_token_raw
-            )
-
+            tokens = [("USDT_ETH", ERC20_USDT, fetch_erc20_raw_balance),
+                      ("USDC_ETH", ERC20_USDC, fetch_erc20_raw_balance)]
+        elif w["chain"] == "TRX":
+            tokens = [("USDT_TRX", TRC20_USDT, fetch_trc20_raw_balance)]
+        else:
+            tokens = []
+        for token_chain, token_contract, fetch in tokens:
+            token_wallet = by_key.get((token_chain, w["address"]))
+            prev_token_raw = int(token_wallet.get("last_raw_balance", 0) or 0) if token_wallet else 0
+            with timing(f"fetch_{token_chain}"):
+                token_raw, rl_token = await fetch(w["address"], token_contract, prev_token_raw)
             if rl_token:
                 chain_rate_limited[token_chain] = True
-
-            # Always ensure the TRC20 token wallet exists, even if balance is 0
+            # Always ensure the token wallet exists, even if balance is 0
             if token_wallet is None:
                 token_wallet = {
-                    "id": next_wallet_id(wallets),
                     "chain": token_chain,
                     "address": w["address"],
                     "label": w.get("label", "") or "",
                     "notes": w.get("notes", "") or "",
-                    "last_raw_balance": int(token_raw),
                 }
-                wallets.append(token_wallet)
-            else:
-                token_wallet["last_raw_balance"] = int(token_raw)
-
-            if token_raw > prev_token_raw:
-                deposit_ids.append(token_wallet["id"])
+            results.append((token_wallet, int(token_raw)))
 
-        return deposit_ids
+        return results
 
-    # Run balance updates for all wallets in parallel
-    deposit_lists = await asyncio.gather(*(update_wallet_balance(w) for w in wallets))
-    # Flatten list of lists into a single list of wallet IDs with new deposits
-    deposits = [wid for sub in deposit_lists for wid in sub if wid is not None]
+    # Fetch balances for all wallets in parallel
+    result_lists = await asyncio.gather(
+        *(update_wallet_balance(w) for w in wallets if not w.get("invalid"))
+    )
 
-    # Persist new balances (including auto-created token wallets)
-    await save_wallets(wallets)
+    # Apply under the registry lock so concurrent edits/deletes aren't lost
+    deposits: List[int] = []
+    with timing("apply"):
+        async with wallets_lock:
+            registry = _registry_unlocked()
+            live_by_id = {w["id"]: w for w in registry}
+            live_by_key = {(w["chain"], w["address"]): w for w in registry}
+            next_id = next_wallet_id(registry)
+            dirty = False
+            # sub[0] is always the wallet that was polled; token templates follow it
+            for parent, (snap, new_raw) in ((sub[0][0], pair) for sub in result_lists for pair in sub):
+                live = live_by_id.get(snap["id"]) if "id" in snap else live_by_key.get((snap["chain"], snap["address"]))
+                if live is None:
+                    if "id" in snap:
+                        continue  # deleted while we were fetching
+                    if (parent["chain"], parent["address"]) not in live_by_key:
+                        continue  # parent deleted while we were fetching; don't recreate its tokens
+                    live = {**snap, "id": next_id, "last_raw_balance": new_raw}
+                    next_id += 1
+                    registry.append(live)
+                    live_by_id[live["id"]] = live_by_key[(live["chain"], live["address"])] = live
+                    portfolio.upsert(live)
+                    changes.touch(live["id"], created=True)
+                    dirty = True
+                    if new_raw > 0:
+                        deposits.append(live["id"])
+                    continue
+                old_raw = int(live.get("last_raw_balance", 0) or 0)
+                if new_raw == old_raw:
+                    continue
+                live["last_raw_balance"] = new_raw
+                portfolio.set_balance(live["id"], new_raw)
+                changes.touch(live["id"])
+                dirty = True
+                if new_raw > old_raw:
+                    deposits.append(live["id"])
+            # Quiet cycles leave the file untouched
+            if dirty:
+                mark_wallets_dirty()
+            wallets = [dict(w) for w in registry]
+            seq = changes.seq
+            delta = changes.since(since) if since is not None else None
 
     # Build response with USD prices and totals
     prices = await fetch_usd_prices()
-    wallets_with_balances, total_usd = build_wallets_with_balances(wallets, prices)
 
     chain_status = {
         c: {
@@ -681,23 +1558,79 @@ async def check_wallets():
         for c in CANONICAL_CHAINS
     }
 
+    if since is not None:
+        out = build_delta(wallets, since, prices, seq, delta)
+        out.update({"deposits": deposits, "chain_status": chain_status})
+        return out
+
+    wallets_with_balances, _total = build_wallets_with_balances(wallets, prices)
+    summary = portfolio.summary(prices)
     return {
         "wallets": wallets_with_balances,
-        "total_usd": total_usd,
+        "total_usd": summary["total_usd"],
         "usd_prices": prices,
+        "summary": summary,
+        "seq": seq,
         "deposits": deposits,
         "chain_status": chain_status,
     }
 
+# ---------- Debug (requires CW_DEBUG_TOKEN) ----------
+
+@app.post("/api/debug/profile")
+async def arm_profile(
+    requests: int = 1,
+    path: str = "/api/check",
+    x_debug_token: Optional[str] = Header(None),
+):
+    """Profile the next `requests` requests whose path starts with `path`."""
+    require_debug_token(x_debug_token)
+    if not 1 <= requests <= 100:
+        raise HTTPException(status_code=400, detail="requests must be between 1 and 100")
+    profiler.arm(requests, path)
+    return {"armed": requests, "path": path}
+
+@app.get("/api/debug/profile")
+async def get_profile(
+    format: str = "text",
+    sort: str = "cumulative",
+    limit: int = 60,
+    x_debug_token: Optional[str] = Header(None),
+):
+    """Merged profile so far: `text` (pstats listing) or `pstats` (binary .prof)."""
+    require_debug_token(x_debug_token)
+    if profiler.stats is None:
+        raise HTTPException(status_code=404, detail=f"No profile captured yet ({profiler.remaining} pending)")
+    headers = {"X-Profile-Captured": str(profiler.captured), "X-Profile-Pending": str(profiler.remaining)}
+    if format == "pstats":
+        headers["Content-Disposition"] = 'attachment; filename="cryptowatcher.prof"'
+        return Response(profiler.as_pstats(), media_type="application/octet-stream", headers=headers)
+    if format != "text":
+        raise HTTPException(status_code=400, detail="format must be text or pstats")
+    try:
+        return PlainTextResponse(profiler.as_text(sort, limit), headers=headers)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+
 def open_browser():
     try:
-        webbrowser.open("http://localhost:8000")
+        import webbrowser
+        webbrowser.open(f"http://localhost:{PORT}")
     except Exception:
         pass
 
-if __name__ == "__main__":
-    timer = threading.Timer(1.0, open_browser)
-    timer.daemon = True
-    timer.start()
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+def run_server() -> None:
+    import uvicorn
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            # WHY: open the browser once the socket is actually listening
+            # instead of guessing with a fixed delay.
+            if self.started and OPEN_BROWSER:
+                threading.Thread(target=open_browser, daemon=True).start()
 
+    _Server(uvicorn.Config(app, host=HOST, port=PORT)).run()
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,64 @@
+# ==== scripts/bench_startup.py ====
+# Usage: python3 scripts/bench_startup.py [--runs 5]
+# Measures cold import time of app.py and launch-to-first-200 on "/" for
+# `python app.py` (browser and provider warmup disabled, temp data dir).
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _env(data_dir: str, port: int) -> dict:
+    env = dict(os.environ)
+    env.update({"CW_DATA_DIR": data_dir, "PORT": str(port), "HOST": "127.0.0.1",
+                "CW_NO_BROWSER": "1", "CW_HTTP_WARMUP": "0"})
+    return env
+
+def import_time(data_dir: str) -> float:
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(data_dir, 0),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_to_first_200(data_dir: str, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "app.py"], cwd=ROOT, env=_env(data_dir, port),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer within timeout")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as data_dir:
+        imports = [import_time(data_dir) for _ in range(args.runs)]
+        firsts = [time_to_first_200(data_dir) for _ in range(args.runs)]
+    print(f"import app      median {statistics.median(imports) * 1000:7.1f} ms  (min {min(imports) * 1000:.1f})")
+    print(f"first 200 on / median {statistics.median(firsts) * 1000:7.1f} ms  (min {min(firsts) * 1000:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,14 @@ APP_NAME="Crypto Watcher"
 
 # 1) Ensure deps
 python3 -m pip install --upgrade pip
-python3 -m pip install pyinstaller fastapi "uvicorn[standard]" httpx pydantic
+python3 -m pip install pyinstaller fastapi "uvicorn[standard]" "httpx[http2]" pydantic pycryptodome
 
 # 2) Clean
 rm -rf build dist .pytest_cache __pycache__ || true
 
+# 2b) Precompress text assets (served as .gz to gzip-capable browsers)
+python3 scripts/precompress_static.py
+
 # 3) Build .app (one-folder is most reliable on mac for frameworks)
 pyinstaller \
   --noconfirm \
@@ -22,6 +25,7 @@ pyinstaller \
   --hidden-import "uvicorn" \
   --hidden-import "anyio" \
   --hidden-import "starlette" \
+  --hidden-import "h2" \
   app.py
 
 # 4) Zip for sharing
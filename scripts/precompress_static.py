@@ -0,0 +1,28 @@
+# ==== scripts/precompress_static.py ====
+# Usage: python3 scripts/precompress_static.py
+# Writes static/<file>.gz next to each text asset; the server serves them to
+# gzip-capable browsers as long as they are newer than the source file.
+
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app import STATIC_DIR  # noqa: E402
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt")
+
+def main() -> None:
+    for name in sorted(os.listdir(STATIC_DIR)):
+        path = os.path.join(STATIC_DIR, name)
+        if not os.path.isfile(path) or not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        with open(path, "rb") as f:
+            raw = f.read()
+        packed = gzip.compress(raw, compresslevel=9, mtime=0)
+        with open(f"{path}.gz", "wb") as f:
+            f.write(packed)
+        print(f"{name}: {len(raw)} -> {len(packed)} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 "use strict";
 
 let wallets = [];
+let summary = null; // server-side aggregates from /api/summary
+let syncSeq = 0;     // last change sequence seen; 0 forces a full resync
+let lastPrices = null;
 let sortField = "usd_balance";
 let sortDirection = "desc";
 let autoCheckIntervalId = null;
@@ -88,8 +91,15 @@ function totals(){
   return t;
 }
 
+function summaryTotals(){
+  if(!summary || !summary.chains) return null;
+  const per={};
+  for(const [c,agg] of Object.entries(summary.chains)) per[c]={ coin:+agg.coin_balance||0, usd:+agg.usd_balance||0 };
+  return { overallUsd:+summary.total_usd||0, per };
+}
+
 function renderHeader(){
-  const t=totals();
+  const t=summaryTotals() || totals();
   $("total-portfolio-usd").textContent = formatUsd(t.overallUsd);
   qsa(".chip").forEach(chip=>{
     const chain=chip.dataset.chain; const c=canonical(chain);
@@ -153,7 +163,7 @@ function renderCards(list){
   for(const w of list){
     const cls = chainClass(w.chain);
     const card=document.createElement("div");
-    card.className=`card card-${cls}`;
+    card.className=`card card-${cls}`+(w.invalid?" invalid":"");
     card.dataset.id=String(w.id);
 
     const accent=document.createElement("div"); accent.className="card-accent"; card.append(accent);
@@ -167,6 +177,7 @@ function renderCards(list){
     head.append(badge,label);
 
     const addr=document.createElement("div"); addr.className="addr"; addr.textContent=shortAddress(w.address); addr.title=w.address;
+    if(w.invalid){ addr.textContent+=" · invalid address (not polled)"; addr.title=`${w.address} failed checksum validation`; }
 
     const row1=document.createElement("div"); row1.className="kv";
     row1.innerHTML = `<div class="label">Balance</div><div class="value">${formatCoin(canonical(w.chain),w.coin_balance)}</div>`;
@@ -207,11 +218,41 @@ function renderCards(list){
 function renderAll(){ renderHeader(); renderCards(sortList(filterList())); }
 
 /* API */
+async function loadSummary(){
+  try{ const r=await fetch("/api/summary"); summary = r.ok ? await r.json() : null; }catch{ summary=null; }
+  renderHeader();
+}
+
+function repriceWallets(prices){
+  if(!prices || JSON.stringify(prices)===JSON.stringify(lastPrices)) return false;
+  lastPrices=prices;
+  for(const w of wallets){ const p=+prices[canonical(w.chain)]||0; w.usd_balance=(+w.coin_balance||0)*p; }
+  return true;
+}
+
+// Patch local state from a delta payload; returns true when cards need re-rendering.
+function applyDelta(d){
+  let dirty=false;
+  if(d.full){ wallets=Array.isArray(d.wallets)? d.wallets : []; dirty=true; }
+  else{
+    const gone=new Set(d.deleted||[]);
+    if(gone.size){ const n=wallets.length; wallets=wallets.filter(w=>!gone.has(w.id)); dirty ||= wallets.length!==n; }
+    const upd=new Map((d.updated||[]).map(w=>[w.id,w]));
+    if(upd.size){ wallets=wallets.map(w=>upd.get(w.id)||w); dirty=true; }
+    const known=new Set(wallets.map(w=>w.id));
+    for(const w of d.added||[]){ if(!known.has(w.id)){ wallets.push(w); dirty=true; } }
+  }
+  if(repriceWallets(d.usd_prices)) dirty=true;
+  if(typeof d.seq==="number") syncSeq=d.seq;
+  summary=d.summary||null;
+  return dirty;
+}
+
 async function loadWallets(){
   try{
-    const r=await fetch("/api/wallets"); const d=await r.json();
-    wallets = Array.isArray(d)? d : Array.isArray(d.wallets)? d.wallets : [];
-  }catch{ wallets=[]; }
+    const r=await fetch(`/api/wallets?since=${syncSeq}`); const d=await r.json();
+    if(Array.isArray(d)) wallets=d; else applyDelta(d);
+  }catch{ wallets=[]; syncSeq=0; }
   renderAll();
 }
 
@@ -236,8 +277,8 @@ async function bulkImport(){
   if(!lines.trim()){ alert("Paste at least one line."); return; }
   try{ await fetch("/api/wallets/bulk",{ method:"POST", headers:{ "Content-Type":"application/json" }, body:JSON.stringify({ chain,lines }) }); qs("#bulk-lines").value=""; await loadWallets(); }catch{}
 }
-async function deleteAllWallets(){ if(!confirm("Delete ALL wallets?")) return; try{ await fetch("/api/wallets",{ method:"DELETE" }); wallets=[]; renderAll(); }catch{} }
-async function deleteWallet(id){ if(!confirm("Delete this wallet?")) return; try{ await fetch(`/api/wallets/${id}`,{ method:"DELETE" }); wallets=wallets.filter(x=>x.id!==id); renderAll(); }catch{} }
+async function deleteAllWallets(){ if(!confirm("Delete ALL wallets?")) return; try{ await fetch("/api/wallets",{ method:"DELETE" }); wallets=[]; summary=null; syncSeq=0; renderAll(); }catch{} }
+async function deleteWallet(id){ if(!confirm("Delete this wallet?")) return; try{ await fetch(`/api/wallets/${id}`,{ method:"DELETE" }); wallets=wallets.filter(x=>x.id!==id); renderAll(); loadSummary(); }catch{} }
 
 /* Modal */
 let editingId=null;
@@ -248,21 +289,25 @@ async function saveModal(){
   const label=$("edit-label").value, notes=$("edit-notes").value;
   try{
     const r=await fetch(`/api/wallets/${editingId}`,{ method:"PUT", headers:{ "Content-Type":"application/json" }, body:JSON.stringify({ label,notes }) });
-    const u=await r.json(); wallets=wallets.map(w=>w.id===u.id?{...w,...u}:w); renderAll();
+    const u=await r.json(); wallets=wallets.map(w=>w.id===u.id?{...w,...u}:w); renderAll(); loadSummary();
   }catch{} closeModal();
 }
 
 /* Check */
 async function runCheck(manual){
-  const prev=new Map(wallets.map(w=>[w.id,{ raw:+(w.raw_balance||w.last_raw_balance||0)||0, usd:+w.usd_balance||0, coin:+w.coin_balance||0 }]));
   try{
-    const r=await fetch("/api/check",{ method:"POST" }); const d=await r.json();
-    if(Array.isArray(d.wallets)) wallets=d.wallets; else if(Array.isArray(d)) wallets=d;
-    renderAll(); setChainStatus(d.chain_status);
+    const r=await fetch(`/api/check?since=${syncSeq}`,{ method:"POST" }); const d=await r.json();
+    // Snapshot only the wallets the server says changed, so cost tracks change volume.
+    const touched=new Set([...(d.updated||[]), ...(d.full? wallets : [])].map(w=>w.id));
+    const prev=new Map(wallets.filter(w=>touched.has(w.id)).map(w=>[w.id,{ raw:w.raw_balance??0, coin:+w.coin_balance||0, usd:+w.usd_balance||0 }]));
+    const dirty=applyDelta(d);
+    if(dirty) renderAll(); else renderHeader();
+    setChainStatus(d.chain_status);
 
     const deposits=Array.isArray(d.deposits)? d.deposits : [];
-    let changed=0;
-    for(const w of wallets){ const p=prev.get(w.id)||{raw:0,usd:0}; const cr=+(w.raw_balance||w.last_raw_balance||0)||0; const cu=+w.usd_balance||0; if(cr!==p.raw||cu!==p.usd) changed++; }
+    // Label edits and resyncs also arrive as updates; only balance moves count as changes.
+    const incoming=d.full? (d.wallets||[]) : [...(d.updated||[]), ...(d.added||[])];
+    const changed=incoming.filter(w=>(w.raw_balance??0)!==(prev.get(w.id)?.raw??0)).length;
     for(const id of deposits){
       const w=wallets.find(x=>x.id===id); if(!w) continue;
       const p=prev.get(id)||{ coin:0, usd:0 };
@@ -273,7 +318,7 @@ async function runCheck(manual){
       addNotif({ type:"deposit", title:"Deposit detected", body:w.label||shortAddress(w.address), meta:`${formatCoin(canonical(w.chain),dCoin)} · ${formatUsd(dUsd)}` });
     }
     if(changed>0 || manual){
-      const t=totals(); addNotif({ type:"updated", title:"Balances updated", body: changed>0? `${changed} wallet${changed===1?"":"s"} changed` : `${wallets.length} checked`, meta:`Portfolio ${formatUsd(t.overallUsd)}` });
+      const t=summaryTotals() || totals(); addNotif({ type:"updated", title:"Balances updated", body: changed>0? `${changed} wallet${changed===1?"":"s"} changed` : `${wallets.length} checked`, meta:`Portfolio ${formatUsd(t.overallUsd)}` });
       beep(520,110);
     }
   }catch(e){
@@ -4,6 +4,7 @@ import json
 import pytest
 import httpx
 
+import app
 from app import set_http_client_for_tests
 
 @pytest.fixture(autouse=True)
@@ -41,3 +42,25 @@ async def inject_client(mock_transport):
     set_http_client_for_tests(client)
     yield
     await client.aclose()
+
+@pytest.fixture()
+async def store(tmp_path, monkeypatch):
+    """Fresh wallet registry backed by a temp file; yields the list of file writes."""
+    writes = []
+    real_write = app._write_file_atomic
+
+    def counting_write(path, text):
+        writes.append(text)
+        real_write(path, text)
+
+    monkeypatch.setattr(app, "DATA_FILE", str(tmp_path / "wallets.json"))
+    monkeypatch.setattr(app, "_write_file_atomic", counting_write)
+    monkeypatch.setattr(app, "WALLETS_FLUSH_DELAY", 0.01)
+    monkeypatch.setattr(app, "_registry", None)
+    monkeypatch.setattr(app, "_dirty", False)
+    monkeypatch.setattr(app, "_flush_task", None)
+    monkeypatch.setattr(app, "portfolio", app.PortfolioAggregator())
+    monkeypatch.setattr(app, "changes", app.ChangeLog())
+    yield writes
+    if app._flush_task is not None:
+        await app._flush_task
@@ -0,0 +1,42 @@
+# tests/test_debug.py
+import marshal
+import pytest
+import httpx
+
+import app
+
+pytestmark = pytest.mark.asyncio
+
+def _asgi_client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app.app), base_url="http://test")
+
+async def test_server_timing_is_opt_in(store):
+    async with _asgi_client() as c:
+        r = await c.get("/api/wallets")
+        assert "server-timing" not in r.headers
+        r = await c.get("/api/wallets", headers={"X-Server-Timing": "1"})
+    metrics = {part.split(";")[0].strip() for part in r.headers["server-timing"].split(",")}
+    assert {"storage", "price", "build", "handler", "serialize", "total"} <= metrics
+
+async def test_profile_endpoint_requires_token(store, monkeypatch):
+    async with _asgi_client() as c:
+        assert (await c.post("/api/debug/profile")).status_code == 404
+        monkeypatch.setattr(app, "DEBUG_TOKEN", "s3cret")
+        assert (await c.post("/api/debug/profile", headers={"X-Debug-Token": "nope"})).status_code == 403
+
+async def test_profile_captures_next_requests(store, monkeypatch):
+    monkeypatch.setattr(app, "DEBUG_TOKEN", "s3cret")
+    monkeypatch.setattr(app, "profiler", app.ProfileCapture())
+    auth = {"X-Debug-Token": "s3cret"}
+    async with _asgi_client() as c:
+        r = await c.post("/api/debug/profile", params={"requests": 2, "path": "/api/summary"}, headers=auth)
+        assert r.json() == {"armed": 2, "path": "/api/summary"}
+        assert (await c.get("/api/debug/profile", headers=auth)).status_code == 404
+        await c.get("/api/summary")
+        await c.get("/api/summary")
+        await c.get("/api/summary")
+        text = await c.get("/api/debug/profile", headers=auth)
+        raw = await c.get("/api/debug/profile", params={"format": "pstats"}, headers=auth)
+    assert text.headers["x-profile-captured"] == "2"
+    assert "get_summary" in text.text
+    assert any(func[2] == "get_summary" for func in marshal.loads(raw.content))
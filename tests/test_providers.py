@@ -3,7 +3,8 @@ import json
 import pytest
 import httpx
 
-from app import fetch_chain_raw_balance, set_http_client_for_tests
+import app
+from app import TRC20_USDT, fetch_chain_raw_balance, set_http_client_for_tests
 
 pytestmark = pytest.mark.asyncio
 
@@ -94,3 +95,72 @@ async def test_trx_rate_limited_returns_previous(mock_transport):
     _add_429(mock_transport, "GET", f"https://api.trongrid.io/v1/accounts/{addr}")
     raw, limited = await fetch_chain_raw_balance("TRX", addr, previous=777)
     assert raw == 777 and limited is True
+
+def _add_trongrid_trc20_ok(transport, address, contract, amount):
+    url = f"https://api.trongrid.io/v1/accounts/{address}"
+    transport.add("GET", url, json_body={"data":[{"balance": 0, "trc20":[{contract: str(amount)}]}]}, status_code=200)
+
+def _add_tron_activity(transport, address, rows, contract=None):
+    cursor = app._tron_cursors[(address, contract or "TRX")]["ts"]
+    params = {"min_timestamp": str(cursor), "limit": "1", "order_by": "block_timestamp,desc"}
+    url = f"https://api.trongrid.io/v1/accounts/{address}/transactions"
+    if contract:
+        url += "/trc20"
+        params["contract_address"] = contract
+    transport.add("GET", url, params=params, json_body={"data": rows}, status_code=200)
+
+@pytest.fixture()
+def tron_cursors():
+    app._tron_cursors.clear()
+    yield app._tron_cursors
+    app._tron_cursors.clear()
+
+async def test_trx_incremental_skips_refresh_without_activity(mock_transport, tron_cursors):
+    addr = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+    _add_trongrid_ok(mock_transport, addr, sun=2_000_000)
+    raw, _ = await fetch_chain_raw_balance("TRX", addr, previous=0)
+    assert raw == 2_000_000 and (addr, "TRX") in tron_cursors
+    # account document changes, but no new transactions -> keep previous without refetching
+    _add_trongrid_ok(mock_transport, addr, sun=9_000_000)
+    _add_tron_activity(mock_transport, addr, [])
+    raw, limited = await fetch_chain_raw_balance("TRX", addr, previous=2_000_000)
+    assert raw == 2_000_000 and limited is False
+
+async def test_trx_incremental_refreshes_on_new_activity(mock_transport, tron_cursors):
+    addr = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+    _add_trongrid_ok(mock_transport, addr, sun=2_000_000)
+    await fetch_chain_raw_balance("TRX", addr, previous=0)
+    ts = tron_cursors[(addr, "TRX")]["ts"] + 5_000
+    _add_trongrid_ok(mock_transport, addr, sun=3_000_000)
+    _add_tron_activity(mock_transport, addr, [{"block_timestamp": ts}])
+    raw, limited = await fetch_chain_raw_balance("TRX", addr, previous=2_000_000)
+    assert raw == 3_000_000 and limited is False
+    assert tron_cursors[(addr, "TRX")]["ts"] >= ts + 1
+
+async def test_trx_incremental_keeps_cursor_when_refresh_fails(mock_transport, tron_cursors):
+    addr = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+    _add_trongrid_ok(mock_transport, addr, sun=2_000_000)
+    await fetch_chain_raw_balance("TRX", addr, previous=0)
+    cursor = dict(tron_cursors[(addr, "TRX")])
+    mock_transport.add("GET", f"https://api.trongrid.io/v1/accounts/{addr}", json_body={"err": "x"}, status_code=500)
+    _add_tron_activity(mock_transport, addr, [{"block_timestamp": cursor["ts"] + 5_000}])
+    raw, limited = await fetch_chain_raw_balance("TRX", addr, previous=2_000_000)
+    assert raw == 2_000_000 and limited is False
+    assert tron_cursors[(addr, "TRX")] == cursor
+    # once the account endpoint recovers the same activity triggers the refresh
+    _add_trongrid_ok(mock_transport, addr, sun=5_000_000)
+    raw, _ = await fetch_chain_raw_balance("TRX", addr, previous=2_000_000)
+    assert raw == 5_000_000
+
+async def test_trc20_incremental_uses_contract_cursor(mock_transport, tron_cursors):
+    addr = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+    _add_trongrid_trc20_ok(mock_transport, addr, TRC20_USDT, 5_000_000)
+    raw, _ = await fetch_chain_raw_balance("USDT_TRX", addr, previous=0)
+    assert raw == 5_000_000
+    _add_trongrid_trc20_ok(mock_transport, addr, TRC20_USDT, 6_000_000)
+    _add_tron_activity(mock_transport, addr, [], contract=TRC20_USDT)
+    raw, _ = await fetch_chain_raw_balance("USDT_TRX", addr, previous=5_000_000)
+    assert raw == 5_000_000
+    # a different previous (e.g. wallet re-added) invalidates the cursor
+    raw, _ = await fetch_chain_raw_balance("USDT_TRX", addr, previous=0)
+    assert raw == 6_000_000
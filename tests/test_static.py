@@ -0,0 +1,42 @@
+# tests/test_static.py
+import gzip
+import os
+import re
+import pytest
+import httpx
+
+import app
+
+pytestmark = pytest.mark.asyncio
+
+async def test_index_uses_versioned_immutable_assets():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app.app), base_url="http://test") as c:
+        index = await c.get("/")
+        assert index.status_code == 200 and index.headers["cache-control"] == "no-cache"
+        urls = re.findall(r'"(/static/(?:script\.js|style\.css)\?v=\w+)"', index.text)
+        assert len(urls) == 2
+        versioned = await c.get(urls[0])
+        plain = await c.get(urls[0].split("?")[0])
+    assert versioned.headers["cache-control"] == app.STATIC_IMMUTABLE
+    assert plain.headers["cache-control"] == "no-cache"
+    assert versioned.content == plain.content
+
+async def test_fresh_gzip_sibling_is_served(tmp_path):
+    body = b"console.log('hi');\n" * 50
+    src, gz = tmp_path / "a.js", tmp_path / "a.js.gz"
+    src.write_bytes(body)
+    gz.write_bytes(gzip.compress(body, mtime=0))
+    os.utime(src, (1_000, 1_000))
+    os.utime(gz, (2_000, 2_000))
+    static = app.CachedStaticFiles(directory=str(tmp_path))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=static), base_url="http://test") as c:
+        packed = await c.get("/a.js", headers={"Accept-Encoding": "gzip"})
+        assert packed.headers["content-encoding"] == "gzip" and packed.content == body
+        assert "javascript" in packed.headers["content-type"]
+        again = await c.get("/a.js", headers={"Accept-Encoding": "gzip", "If-None-Match": packed.headers["etag"]})
+        assert again.status_code == 304
+        identity = await c.get("/a.js", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers and identity.content == body
+        os.utime(src, (3_000, 3_000))  # source edited after the .gz was built
+        stale = await c.get("/a.js", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stale.headers and stale.content == body
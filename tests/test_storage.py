@@ -0,0 +1,97 @@
+# tests/test_storage.py
+import asyncio
+import json
+import threading
+import time
+import pytest
+
+import app
+from app import WalletCreate, WalletUpdate
+
+pytestmark = pytest.mark.asyncio
+
+ADDR = "1BoatSLRHtKNngkdXEeobR76b53LETtpyT"
+
+def _add_blockstream(transport, address, funded):
+    body = {"chain_stats": {"funded_txo_sum": funded, "spent_txo_sum": 0}, "mempool_stats": {}}
+    transport.add("GET", f"https://blockstream.info/api/address/{address}", json_body=body)
+
+async def test_burst_of_edits_is_one_atomic_write(store):
+    await app.create_wallet(WalletCreate(chain="BTC", address=ADDR))
+    for i in range(5):
+        await app.update_wallet(1, WalletUpdate(label=f"l{i}"))
+    await app.flush_wallets()
+    assert len(store) == 1
+    with open(app.DATA_FILE, encoding="utf-8") as f:
+        assert json.load(f)[0]["label"] == "l4"
+
+async def test_quiet_check_does_not_write(store, mock_transport):
+    _add_blockstream(mock_transport, ADDR, 1000)
+    await app.create_wallet(WalletCreate(chain="BTC", address=ADDR))
+    await app.check_wallets()
+    await app.flush_wallets()
+    assert len(store) == 1
+    await app.check_wallets()
+    await app.flush_wallets()
+    assert len(store) == 1
+
+async def test_label_edit_during_check_is_not_lost(store, mock_transport):
+    _add_blockstream(mock_transport, ADDR, 5000)
+    await app.create_wallet(WalletCreate(chain="BTC", address=ADDR))
+
+    async def edit_midway():
+        await asyncio.sleep(0)
+        await app.update_wallet(1, WalletUpdate(label="renamed"))
+
+    await asyncio.gather(app.check_wallets(), edit_midway())
+    await app.flush_wallets()
+    with open(app.DATA_FILE, encoding="utf-8") as f:
+        saved = json.load(f)[0]
+    assert saved["label"] == "renamed" and saved["last_raw_balance"] == 5000
+
+async def test_delete_during_check_does_not_recreate_tokens(store, mock_transport):
+    eth = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+    await app.create_wallet(WalletCreate(chain="ETH", address=eth))
+
+    async def delete_midway():
+        await asyncio.sleep(0)
+        await app.delete_wallet(1)
+
+    await asyncio.gather(app.check_wallets(), delete_midway())
+    assert await app.load_wallets() == []
+
+async def test_edit_during_slow_write_is_flushed(store, monkeypatch):
+    writing = threading.Event()
+    write = app._write_file_atomic
+
+    def slow_write(path, text):
+        writing.set()
+        time.sleep(0.2)
+        write(path, text)
+
+    monkeypatch.setattr(app, "_write_file_atomic", slow_write)
+    await app.create_wallet(WalletCreate(chain="BTC", address=ADDR))
+    await asyncio.to_thread(writing.wait, 2)
+    await app.update_wallet(1, WalletUpdate(label="during write"))
+    await app._flush_task
+    assert len(store) == 2
+    with open(app.DATA_FILE, encoding="utf-8") as f:
+        assert json.load(f)[0]["label"] == "during write"
+
+async def test_preload_reads_registry_off_loop(store):
+    with open(app.DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump([{"id": 1, "chain": "BTC", "address": ADDR},
+                   {"id": 2, "chain": "BTC", "address": ADDR[:-1] + "U"}], f)
+    await app.preload_wallets()
+    assert [w["invalid"] for w in app._registry] == [False, True]
+
+async def test_invalid_flag_is_not_persisted(store):
+    with open(app.DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump([{"id": 1, "chain": "BTC", "address": ADDR[:-1] + "U"}], f)
+    await app.preload_wallets()
+    await app.update_wallet(1, WalletUpdate(label="typo"))
+    await app.flush_wallets()
+    with open(app.DATA_FILE, encoding="utf-8") as f:
+        saved = json.load(f)[0]
+    assert saved["label"] == "typo" and "invalid" not in saved
+    assert (await app.load_wallets())[0]["invalid"] is True
@@ -0,0 +1,46 @@
+# tests/test_summary.py
+import pytest
+
+from app import PortfolioAggregator, build_wallets_with_balances
+
+PRICES = {"BTC": 50_000.0, "ETH": 2_000.0, "TRX": 0.1, "USDT_TRX": 1.0, "USDT_ETH": 1.0, "USDC_ETH": 1.0}
+
+def _wallets():
+    return [
+        {"id": 1, "chain": "BTC", "address": "a", "label": "cold", "last_raw_balance": 50_000_000},
+        {"id": 2, "chain": "BTC", "address": "b", "label": "", "last_raw_balance": 25_000_000},
+        {"id": 3, "chain": "ETH", "address": "c", "label": "cold", "last_raw_balance": 10**18},
+        {"id": 4, "chain": "USDT_TRX", "address": "d", "label": "hot", "last_raw_balance": 5_000_000},
+    ]
+
+def test_summary_matches_per_wallet_totals():
+    agg = PortfolioAggregator()
+    agg.load(_wallets())
+    s = agg.summary(PRICES)
+    _res, total = build_wallets_with_balances(_wallets(), PRICES)
+    assert s["wallet_count"] == 4
+    assert s["total_usd"] == pytest.approx(total)
+    assert s["chains"]["BTC"]["raw_balance"] == 75_000_000
+    assert s["chains"]["BTC"]["count"] == 2
+    assert s["labels"]["cold"]["usd_balance"] == pytest.approx(25_000 + 2_000)
+    assert s["labels"]["cold"]["chains"]["ETH"]["coin_balance"] == pytest.approx(1.0)
+
+def test_incremental_updates_match_full_rebuild():
+    wallets = _wallets()
+    agg = PortfolioAggregator()
+    agg.load(wallets)
+
+    agg.set_balance(2, 0)
+    agg.remove(1)
+    agg.upsert({"id": 4, "chain": "USDT_TRX", "address": "d", "label": "cold", "last_raw_balance": 7_000_000})
+    agg.upsert({"id": 5, "chain": "TRX", "address": "e", "label": "hot", "last_raw_balance": 3_000_000})
+
+    expected = [
+        {"id": 2, "chain": "BTC", "address": "b", "label": "", "last_raw_balance": 0},
+        {"id": 3, "chain": "ETH", "address": "c", "label": "cold", "last_raw_balance": 10**18},
+        {"id": 4, "chain": "USDT_TRX", "address": "d", "label": "cold", "last_raw_balance": 7_000_000},
+        {"id": 5, "chain": "TRX", "address": "e", "label": "hot", "last_raw_balance": 3_000_000},
+    ]
+    fresh = PortfolioAggregator()
+    fresh.load(expected)
+    assert agg.summary(PRICES) == fresh.summary(PRICES)
@@ -0,0 +1,52 @@
+# tests/test_sync.py
+import pytest
+
+import app
+from app import ChangeLog, WalletCreate
+
+def test_delta_since_reports_added_updated_deleted():
+    log = ChangeLog()
+    log.touch(1, created=True)
+    log.touch(2, created=True)
+    seen = log.seq
+    log.touch(1)
+    log.touch(3, created=True)
+    log.touch(3)
+    log.delete(2)
+    added, updated, deleted = log.since(seen)
+    assert added == {3} and updated == {1} and deleted == [2]
+    assert log.since(log.seq) == (set(), set(), [])
+
+def test_unknown_or_stale_since_requires_full_resync():
+    log = ChangeLog()
+    log.touch(1, created=True)
+    assert log.since(0) is None
+    assert log.since(log.seq + 1) is None
+    seen = log.seq
+    log.reset()
+    assert log.seq > seen and log.since(seen) is None
+
+def test_recreated_id_is_not_reported_deleted():
+    log = ChangeLog()
+    seen = log.seq
+    log.delete(5)
+    log.touch(5, created=True)
+    added, updated, deleted = log.since(seen)
+    assert added == {5} and deleted == []
+
+@pytest.mark.asyncio
+async def test_wallet_added_during_price_fetch_is_in_next_delta(store, monkeypatch):
+    await app.create_wallet(WalletCreate(chain="BTC", address="1BoatSLRHtKNngkdXEeobR76b53LETtpyT"))
+    first = await app.get_wallets(since=0)
+    fetch_prices = app.fetch_usd_prices
+
+    async def prices_with_concurrent_add():
+        await app.create_wallet(WalletCreate(chain="ETH", address="0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"))
+        return await fetch_prices()
+
+    monkeypatch.setattr(app, "fetch_usd_prices", prices_with_concurrent_add)
+    mid = await app.get_wallets(since=first["seq"])
+    monkeypatch.setattr(app, "fetch_usd_prices", fetch_prices)
+    assert mid["added"] == []
+    later = await app.get_wallets(since=mid["seq"])
+    assert [w["chain"] for w in later["added"]] == ["ETH"]
@@ -0,0 +1,52 @@
+# tests/test_transport.py
+import pytest
+import httpx
+
+import app
+from app import close_client, get_client, set_http_client_for_tests, warmup_client
+
+pytestmark = pytest.mark.asyncio
+
+async def test_warmup_touches_every_provider_origin():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, f"{request.url.scheme}://{request.url.host}"))
+        return httpx.Response(405)
+
+    set_http_client_for_tests(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    await warmup_client(resolve=False)
+    assert {m for m, _ in seen} == {"HEAD"}
+    assert {o for _, o in seen} == set(app._provider_pools())
+    await close_client()
+
+async def test_close_client_resets_shared_client():
+    client = get_client()
+    await close_client()
+    assert client.is_closed
+    fresh = get_client()
+    assert fresh is not client
+    await close_client()
+
+async def test_client_honours_proxy_env(monkeypatch):
+    for var in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
+                "http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.local:3128")
+    monkeypatch.setenv("NO_PROXY", "api.coingecko.com")
+    proxies = []
+    real_transport = app._transport
+
+    def spy(pool_size, proxy=None):
+        proxies.append(proxy)
+        return real_transport(pool_size, proxy)
+
+    monkeypatch.setattr(app, "_transport", spy)
+    await close_client()
+    get_client()
+    await close_client()
+    assert app._proxy_for("https://blockstream.info") == "http://proxy.local:3128"
+    assert app._proxy_for("https://api.coingecko.com") is None
+    # default transport + every mounted origin except the NO_PROXY one
+    assert proxies.count("http://proxy.local:3128") == len(app._provider_pools())
+    assert proxies.count(None) == 1
@@ -0,0 +1,45 @@
+# tests/test_validation.py
+import pytest
+
+from app import is_valid_address, is_valid_btc_address, is_valid_eth_address, is_valid_trx_address, keccak256, parse_bulk_lines
+
+@pytest.mark.parametrize("addr,ok", [
+    ("1BoatSLRHtKNngkdXEeobR76b53LETtpyT", True),              # P2PKH
+    ("3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy", True),              # P2SH
+    ("1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb", False),             # bad checksum
+    ("bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq", True),      # bech32 v0
+    ("bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdp", False),
+    ("bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0", True),  # bech32m v1
+    ("bc1qAr0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq", False),     # mixed case
+])
+def test_btc_addresses(addr, ok):
+    assert is_valid_btc_address(addr) is ok
+
+def test_keccak256_empty():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+
+def test_keccak256_fallback_matches_native():
+    from app import _keccak256_py
+    for data in (b"", b"abc", bytes(range(256)) * 3):
+        assert _keccak256_py(data) == keccak256(data)
+
+@pytest.mark.parametrize("addr,ok", [
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed", True),
+    ("0x5aaeb6053f3e94c9b9a09f33669435e7ef1beaed", True),      # no checksum
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD", False),     # wrong case
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeg", False),
+])
+def test_eth_addresses(addr, ok):
+    assert is_valid_eth_address(addr) is ok
+
+def test_trx_addresses():
+    assert is_valid_trx_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t")
+    assert not is_valid_trx_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6u")
+    assert is_valid_address("USDT_TRX", "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t")
+
+def test_bulk_lines_drop_invalid():
+    lines = "1BoatSLRHtKNngkdXEeobR76b53LETtpyT, boat\n\n1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb\n3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy"
+    assert parse_bulk_lines("BTC", lines) == [
+        ("1BoatSLRHtKNngkdXEeobR76b53LETtpyT", "boat"),
+        ("3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy", ""),
+    ]